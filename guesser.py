@@ -1,8 +1,80 @@
-from random import choice
+from random import choice, sample
+from functools import lru_cache
+from math import log
 import yaml
 from rich.console import Console
 from collections import Counter
 
+# Load the word list once so repeated Guesser instances share it.
+# The libyaml C loader is much faster; fall back to the pure-Python one if PyYAML was built without it.
+with open('wordlist.yaml') as f:
+    _WORD_LIST = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+_POW3 = (1, 3, 9, 27, 81)  # Base-3 place value of each feedback position
+_ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+# Second guess per (first guess, result): computed once, then reused across games
+_SECOND_GUESSES = {}
+
+
+def _letter_mask(letters):
+    """Encodes a collection of letters as a 26-bit letter-presence mask."""
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter) - 97)
+    return mask
+
+
+def _score_hamming1(words):
+    '''
+    Counts, for every word, how many other words differ from it in exactly one position.
+    - Words at distance one share exactly one wildcard pattern (e.g. 'c_ane'), so bucketing
+      by pattern replaces the pairwise comparison with a linear pass.
+    '''
+    buckets = Counter(word[:i] + '_' + word[i + 1:] for word in words for i in range(5))
+    return [
+        sum(buckets[word[:i] + '_' + word[i + 1:]] for i in range(5)) - 5
+        for word in words
+    ]
+
+
+def _feedback_pattern(guess, answer):
+    '''
+    Encodes the feedback Wordle would give for guess against answer as a base-3 integer.
+    - Both words are bytes, so every letter is an int and the compares stay in C.
+    - Position i contributes 0 (grey), 1 (misplaced) or 2 (correct) times 3**i.
+    - A solved word is caught by a single string compare instead of five letter compares.
+    '''
+    if guess == answer:
+        return 242
+
+    pattern = 0
+    unmatched = bytearray()
+    for g, a, weight in zip(guess, answer, _POW3):
+        if g == a:
+            pattern += 2 * weight
+        else:
+            unmatched.append(a)
+    for g, a, weight in zip(guess, answer, _POW3):
+        if g != a and g in unmatched:
+            pattern += weight
+            unmatched.remove(g)
+    return pattern
+
+
+def _partition_entropy(guess, candidates):
+    """Shannon entropy of the feedback patterns guess would split candidates into."""
+    total = len(candidates)
+    counts = Counter(_feedback_pattern(guess, answer) for answer in candidates)
+    return -sum(count / total * log(count / total) for count in counts.values())
+
+
+# Word tables built once per process and shared by every Guesser instance
+_WORD_MASKS = [_letter_mask(word) for word in _WORD_LIST]
+_WORD_BYTES = [word.encode('ascii') for word in _WORD_LIST]
+_COLUMNS = [''.join(column).encode() for column in zip(*_WORD_LIST)]
+
+
 class Guesser:
     '''
         Wordle Solver:
@@ -11,16 +83,23 @@ class Guesser:
         - Subsequent guesses prioritize narrowing down search space efficiently.
     '''
     def __init__(self, manual):
-        self.word_list = yaml.load(open('wordlist.yaml'), Loader=yaml.FullLoader)
+        self.word_list = _WORD_LIST
         self._manual = manual
         self.console = Console()
         
         self._tried = []
-        self.first_guess = self.analysis(self.word_list, allow_duplicates=False)  # Run letter frequency analysis for the first guess
+        self._tried_set = set()  # Same guesses as _tried, for O(1) membership checks
+        self.first_guess = self.analysis(tuple(self.word_list), allow_duplicates=False)  # Run letter frequency analysis for the first guess
 
         self._invalid_letters = set()   # Letters confirmed as NOT in the word
         self._correct_positions = [''] * 5  # Correct letters in their positions
-        self._misplaced_letters = {}  # Letters in the word but in the wrong position
+        self._misplaced = [0] * 26  # Per letter, bitmask of positions where it was misplaced
+        self._required_mask = 0  # Bitmask of letters seen misplaced, so known to be in the word
+        self._candidates = list(range(len(self.word_list)))  # Indices of words still consistent with feedback
+
+        self._word_masks = _WORD_MASKS  # Letter-presence mask per word
+        self._word_bytes = _WORD_BYTES  # ASCII-encoded words for the feedback kernel
+        self._columns = _COLUMNS  # Letter codes per position
 
         self.guess_count = 0
         self.first_guess_letters = set(self.first_guess)  # Track letters used in the first guess
@@ -28,55 +107,41 @@ class Guesser:
     def restart_game(self):
         """Resets the solver for a new game."""
         self._tried = []
+        self._tried_set = set()
         self._invalid_letters = set()
         self._correct_positions = [''] * 5
-        self._misplaced_letters = {}
+        self._misplaced = [0] * 26
+        self._required_mask = 0
+        self._candidates = list(range(len(self.word_list)))
         self.guess_count = 0
         self.first_guess_letters = set(self.first_guess)
 
-    def analysis(self, word_list, allow_duplicates=False):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def analysis(word_list, allow_duplicates=False):
         """
         Optimized first-guess selection based on letter frequency.
         - Determines the most frequent letters and their best positions and avoids duplicate letters.
+        - Cached on the word list tuple, so it only needs to be calculated once.
         """
-        letter_frequency = [{} for _ in range(5)]
-        overall_frequency = {}
-
-        # Calculate letter frequency for each position
-        for word in word_list:
-            for i in range(5):
-                letter = word[i]
-                letter_frequency[i][letter] = letter_frequency[i].get(letter, 0) + 1
-                overall_frequency[letter] = overall_frequency.get(letter, 0) + 1
-
-        # Sort letters by frequency for each position
-        sorted_letter_frequency = [
-            sorted(freq.items(), key=lambda item: item[1], reverse=True)
-            for freq in letter_frequency
-        ]
+        # Calculate letter frequency for each position (one Counter pass per column)
+        letter_frequency = [Counter(column) for column in zip(*word_list)]
+        overall_frequency = Counter("".join(word_list))
 
         # Find the five most frequent letters overall (sorted in descending order)
-        sorted_overall_letters = sorted(overall_frequency.keys(), key=lambda l: overall_frequency[l], reverse=True)
-        top_five_letters = sorted_overall_letters[:5]  # Take only the top 5 most used letters
+        top_five_letters = [letter for letter, _ in overall_frequency.most_common(5)]
 
         # Assign the top 5 letters to their most common position in order of frequency
         chosen_word = [''] * 5  # Initialize empty word
         used_letters = set()
 
         for letter in top_five_letters:
-            best_position = None
-            highest_freq = -1  # Track highest frequency position
-
-            # Find the most frequent available position for this letter
-            for pos in range(5):
-                if letter in dict(sorted_letter_frequency[pos]) and chosen_word[pos] == '':
-                    letter_freq = dict(sorted_letter_frequency[pos])[letter]
-                    if letter_freq > highest_freq:
-                        best_position = pos
-                        highest_freq = letter_freq  # Update the best position based on frequency
+            # Find the most frequent available position for this letter (Counter gives 0 when unseen)
+            free_positions = [pos for pos in range(5) if chosen_word[pos] == '']
+            best_position = max(free_positions, key=lambda pos: letter_frequency[pos][letter])
 
             # Assign letter to its most common available position
-            if best_position is not None:
+            if letter_frequency[best_position][letter]:
                 chosen_word[best_position] = letter
                 used_letters.add(letter)
 
@@ -114,71 +179,73 @@ class Guesser:
             if len(last_guess) != 5:
                 raise ValueError("Last guess must be a 5-letter word")
 
-            # Process feedback from Wordle and parse it.
+            # Process feedback from Wordle and parse it once: the letter itself is green, '-' misplaced, '+' grey
+            greens, misplaced, greys = [], [], []
             for i, char in enumerate(result):
-                if char.isalpha():  
-                    self._correct_positions[i] = last_guess[i]  
-                    if last_guess[i] in self._invalid_letters:
-                        self._invalid_letters.remove(last_guess[i])
-                elif char == '-':  
-                    if last_guess[i] not in self._misplaced_letters:
-                        self._misplaced_letters[last_guess[i]] = set()
-                    self._misplaced_letters[last_guess[i]].add(i)
-                elif char == '+':  
-                    if last_guess[i] not in self._misplaced_letters and last_guess[i] not in self._correct_positions:
-                        self._invalid_letters.add(last_guess[i])
-
-            # Filter the word list based on known information
-            filtered_word_list = [
-                word for word in self.word_list
-                if not any(letter in word for letter in self._invalid_letters) and
-                not any(self._correct_positions[i] and word[i] != self._correct_positions[i] for i in range(5)) and
-                not any(letter in self._misplaced_letters and i in self._misplaced_letters[letter] for i, letter in enumerate(word)) and
-                all(letter in word for letter in self._misplaced_letters)  
-            ]                
+                if char.isalpha():
+                    greens.append((i, last_guess[i]))
+                elif char == '-':
+                    misplaced.append((i, last_guess[i]))
+                else:
+                    greys.append((i, last_guess[i]))
+
+            # A grey letter is only absent if no other copy of it was green or misplaced in this guess
+            present_letters = {letter for _, letter in greens + misplaced}
+            absent_letters = {letter for _, letter in greys if letter not in present_letters}
+
+            for i, letter in greens:
+                self._correct_positions[i] = letter
+            for i, letter in misplaced:
+                self._misplaced[ord(letter) - 97] |= 1 << i
+            self._invalid_letters |= absent_letters
+
+            # Constraints introduced by this result only; earlier ones already shaped self._candidates
+            excluded = misplaced + greys  # Letter not at position i
+            invalid_mask = _letter_mask(absent_letters)
+            required_mask = _letter_mask(letter for _, letter in misplaced)
+            self._required_mask |= required_mask
+
+            # Prune the remaining candidates instead of re-filtering the whole word list,
+            # one constraint at a time so each pass scans a single contiguous column.
+            # Most selective first: greens, then one mask pass for absent and required letters, then positions.
+            candidates = self._candidates
+            for i, letter in greens:
+                column, code = self._columns[i], ord(letter)
+                candidates = [idx for idx in candidates if column[idx] == code]
+            letter_mask = invalid_mask | required_mask
+            if letter_mask:
+                candidates = [idx for idx in candidates if (self._word_masks[idx] & letter_mask) == required_mask]
+            for i, letter in excluded:
+                column, code = self._columns[i], ord(letter)
+                candidates = [idx for idx in candidates if column[idx] != code]
+            self._candidates = candidates
+            filtered_word_list = [self.word_list[idx] for idx in self._candidates]
 
             #print(f'Length of available words = {len(filtered_word_list)}')
             #print(f'Filtered word list: {filtered_word_list}')
 
             # Second Guess Optimization (Adaptive Strategy)
-            if self.guess_count == 1:
-                if len(self._misplaced_letters) > 2: # too many misplaced letters. better changing the places of the letters for the information gain
-                    # Prioritize keeping misplaced letters in a new position
-                    second_guess_list = [
-                        word for word in filtered_word_list if all(letter in word for letter in self._misplaced_letters)
+            if self.guess_count == 1 and (self.first_guess, result) in _SECOND_GUESSES:
+                # The state after the first guess depends only on its result, so reuse the earlier choice
+                guess = _SECOND_GUESSES[(self.first_guess, result)]
+
+            elif self.guess_count == 1:
+                # Candidates already keep every misplaced letter, so they are the pool for the "too many misplaced" case
+                second_guess_pool = list(self._candidates)
+                if self._required_mask.bit_count() <= 2:
+                    # Also probe with words from the whole list that use five new, distinct letters
+                    first_guess_mask = _letter_mask(self.first_guess_letters)
+                    second_guess_pool += [
+                        idx for idx, mask in enumerate(self._word_masks)
+                        if not (mask & first_guess_mask) and mask.bit_count() == 5
                     ]
-                else:
-                    # Choose high-entropy words that avoid first guess letters
-                    letter_entropy = {letter: sum(1 for word in filtered_word_list if letter in word)
-                                      for letter in set("".join(filtered_word_list))}
-                    sorted_letters = sorted(letter_entropy, key=letter_entropy.get, reverse=True)
-
-                    second_guess_list = [
-                        word for word in filtered_word_list if not any(letter in self.first_guess_letters for letter in word)
-                    ]
-
-                # For too many misplaced letters situation, choose a word from the second_guess_list
-                if second_guess_list:
-                    guess = second_guess_list[0]
-
-                else:
-                    # Construct a second guess ensuring it reaches 5 letters
-                    second_guess = []
-                    used_letters = set()
-
-                    for letter in sorted_letters:
-                        if letter not in self.first_guess_letters and letter not in used_letters:
-                            second_guess.append(letter)
-                            used_letters.add(letter)
-                        if len(second_guess) == 5:
-                            break
-
-                    # If still not 5 letters, fill remaining slots with highest entropy letters
-                    if len(second_guess) < 5:
-                        second_guess = choice(filtered_word_list)
 
-                    guess = ''.join(second_guess)
+                # Choose the real word that splits the remaining candidates best
+                candidate_bytes = [self._word_bytes[idx] for idx in self._candidates]
+                best = max(second_guess_pool, key=lambda idx: _partition_entropy(self._word_bytes[idx], candidate_bytes))
+                guess = self.word_list[best]
 
+                _SECOND_GUESSES[(self.first_guess, result)] = guess
                 #print(f'Second guess based on entropy: {guess}')
 
             # Handling the edge case of a single missing letter
@@ -192,9 +259,9 @@ class Guesser:
                 # Construct the guess using possible candidates
                 guessie = list(possible_candidates)  # Convert set to list
 
-                # If there are fewer than 5 letters, fill the rest with random letters
-                while len(guessie) < 5:
-                    guessie.append(choice('abcdefghijklmnopqrstuvwxyz'))  # Add random letters if needed
+                # If there are fewer than 5 letters, fill the rest with distinct random letters
+                if len(guessie) < 5:
+                    guessie += sample([letter for letter in _ALPHABET if letter not in possible_candidates], 5 - len(guessie))
 
                 # Convert list to string
                 guess = ''.join(guessie[:5])  # Ensure it's exactly 5 characters long
@@ -203,25 +270,23 @@ class Guesser:
 
             # Search-Space Splitting for Later Guesses
             elif filtered_word_list:
-                word_scores = {
-                    word: sum(1 for other_word in filtered_word_list if sum(a != b for a, b in zip(word, other_word)) == 1)
-                    for word in filtered_word_list
-                }
+                word_scores = dict(zip(filtered_word_list, _score_hamming1(filtered_word_list)))
                 guess = max(word_scores, key=word_scores.get)
 
             else:
                 guess = choice(filtered_word_list)  
 
         # Ensure the solver does not make the same guess twice.
-        while guess in self._tried:
-            guess = choice(filtered_word_list)
+        if guess in self._tried_set:
+            guess = next(word for word in filtered_word_list if word not in self._tried_set)
 
         self._tried.append(guess)
+        self._tried_set.add(guess)
         self.guess_count += 1  
 
        #self.console.print(f"Guessing: {guess}")
        #print(f'Self.tried = {self._tried}')
        #print(f'Self.correct_positions = {self._correct_positions}')
-       #print(f'Self.misplaced_letters = {self._misplaced_letters}')
+       #print(f'Self.misplaced = {self._misplaced}')
        #print(f'Self.invalid_letters = {self._invalid_letters}')
         return guess